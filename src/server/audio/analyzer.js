@@ -6,10 +6,10 @@
 
 const path = require('path');
 const fs = require('fs');
-const { runPythonScript, checkPythonEnvironment } = require('../pythonBridge');
+const { runPythonScript, runPythonWorker, checkPythonEnvironment } = require('../pythonBridge');
 const config = require('../config');
 const { nanoid } = require('nanoid');
-const { pathResolver, getSystemResources } = require('../utils/systemUtils');
+const { pathResolver, getSystemResources, fileManager } = require('../utils/systemUtils');
 
 /**
  * Initialize the analyzer module
@@ -70,7 +70,7 @@ async function analyzeAudio(filePath, options = {}) {
       if (!fs.existsSync(cacheDir)) {
         fs.mkdirSync(cacheDir, { recursive: true });
       }
-      const fileHash = path.basename(filePath).split('.')[0]; // Simple caching by filename
+      const fileHash = await fileManager.hashFile(filePath); // Cache by content, so renamed uploads still hit
       opts.cachePath = path.join(cacheDir, `analysis_${fileHash}.json`);
     }
     
@@ -91,10 +91,19 @@ async function analyzeAudio(filePath, options = {}) {
     // Run Python analysis script to extract audio features
     let features;
     try {
-      features = await runPythonScript(
-        'analyze_audio.py',
-        [filePath, opts.lightMode.toString()]
-      );
+      try {
+        // Reuse the long-lived analysis worker so librosa is only imported once
+        features = await runPythonWorker(
+          'analysis_worker.py',
+          { audio_path: filePath, light_mode: opts.lightMode }
+        );
+      } catch (workerError) {
+        console.warn('Analysis worker failed, running one-off script:', workerError.message);
+        features = await runPythonScript(
+          'analyze_audio.py',
+          [filePath, opts.lightMode.toString()]
+        );
+      }
       
       // If Python analysis failed, it will return an error in the features object
       if (features && features.error) {
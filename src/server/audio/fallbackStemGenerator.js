@@ -6,7 +6,27 @@
 
 const path = require('path');
 const fs = require('fs');
-const { execSync } = require('child_process');
+const { spawn } = require('child_process');
+
+/**
+ * Run FFmpeg without blocking the event loop
+ * @param {string} ffmpegPath FFmpeg executable
+ * @param {string[]} args Command line arguments
+ * @returns {Promise<void>} Resolves when FFmpeg exits successfully
+ */
+function runFfmpeg(ffmpegPath, args) {
+  return new Promise((resolve, reject) => {
+    const proc = spawn(ffmpegPath, args, { stdio: 'ignore' });
+    proc.on('error', reject);
+    proc.on('exit', (code) => {
+      if (code === 0) {
+        resolve();
+      } else {
+        reject(new Error(`FFmpeg exited with code ${code}`));
+      }
+    });
+  });
+}
 
 /**
  * Create fallback stems when separation fails
@@ -30,7 +50,8 @@ async function createFallbackStems(filePath, outputDir) {
     // Basic FFmpeg command to create stem copies
     const ffmpegPath = 'ffmpeg'; // Assuming ffmpeg is in PATH
     
-    for (const stemType of stemTypes) {
+    // The four encodes are independent, so run them concurrently
+    await Promise.all(stemTypes.map(async (stemType) => {
       const outputPath = path.join(outputDir, `${stemType}.mp3`);
       fallbackStems[stemType] = outputPath;
       
@@ -58,8 +79,7 @@ async function createFallbackStems(filePath, outputDir) {
         }
         
         // Execute FFmpeg command
-        const command = `${ffmpegPath} -i "${filePath}" -af "${filter}" -codec:a libmp3lame -qscale:a 2 "${outputPath}" -y`;
-        execSync(command, { stdio: 'ignore' });
+        await runFfmpeg(ffmpegPath, ['-i', filePath, '-af', filter, '-codec:a', 'libmp3lame', '-qscale:a', '2', outputPath, '-y']);
         
         // Verify the file was created
         if (!fs.existsSync(outputPath)) {
@@ -77,7 +97,7 @@ async function createFallbackStems(filePath, outputDir) {
           fallbackStems[stemType] = filePath;
         }
       }
-    }
+    }));
     
     return fallbackStems;
   } catch (error) {
@@ -75,9 +75,8 @@ async function processAudio(filePath, options = {}) {
     // Reduce sample rate for very long audio in light mode
     const sampleRate = (opts.lightMode && fileInfo.duration > 180) ? 22050 : opts.sampleRate;
     
-    // Convert to compatible format for analysis
-    const outputPath = `${filePath.split('.')[0]}_processed.wav`;
-    
+    // Convert to compatible format for analysis. The WAV is streamed back
+    // from ffmpeg's stdout instead of being written to disk and read again
     // Build ffmpeg command based on options and system capabilities
     return new Promise((resolve, reject) => {
       let command = ffmpeg(filePath)
@@ -99,15 +98,12 @@ async function processAudio(filePath, options = {}) {
         command = command.audioBitrate('96k');
       }
       
+      const chunks = [];
       command.format('wav')
         .on('error', (err) => reject(err))
-        .on('end', () => {
-          fs.readFile(outputPath, (err, data) => {
-            if (err) return reject(err);
-            resolve(data);
-          });
-        })
-        .save(outputPath);
+        .on('end', () => resolve(patchWavSizes(Buffer.concat(chunks))))
+        .pipe()
+        .on('data', (chunk) => chunks.push(chunk));
     });
   } catch (error) {
     console.error('Audio processing error:', error);
@@ -115,6 +111,33 @@ async function processAudio(filePath, options = {}) {
   }
 }
 
+/**
+ * Fill in the RIFF and data chunk sizes of a WAV streamed from ffmpeg
+ * ffmpeg can't seek back on a pipe, so it leaves both sizes at 0xFFFFFFFF;
+ * the buffer holds the whole file, so the real sizes are known here
+ * @param {Buffer} wav Complete WAV file contents
+ * @returns {Buffer} The same buffer with its header sizes patched
+ */
+function patchWavSizes(wav) {
+  if (wav.length < 12 || wav.toString('ascii', 0, 4) !== 'RIFF' || wav.toString('ascii', 8, 12) !== 'WAVE') {
+    return wav;
+  }
+  
+  wav.writeUInt32LE(wav.length - 8, 4);
+  
+  let offset = 12;
+  while (offset + 8 <= wav.length) {
+    if (wav.toString('ascii', offset, offset + 4) === 'data') {
+      wav.writeUInt32LE(wav.length - offset - 8, offset + 4);
+      break;
+    }
+    const size = wav.readUInt32LE(offset + 4);
+    offset += 8 + size + (size % 2);
+  }
+  
+  return wav;
+}
+
 /**
  * Get audio file information for making processing decisions
  * @param {string} filePath Path to the audio file
@@ -166,7 +189,8 @@ function createAudioStream(audioBuffer) {
  */
 function cleanupProcessedFiles(basePath) {
   try {
-    const processedPath = `${basePath.split('.')[0]}_processed.wav`;
+    const { dir, name } = path.parse(basePath);
+    const processedPath = path.join(dir, `${name}_processed.wav`);
     if (fs.existsSync(processedPath)) {
       fs.unlinkSync(processedPath);
       console.log(`Cleaned up temporary file: ${processedPath}`);
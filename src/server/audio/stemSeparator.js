@@ -13,6 +13,19 @@ const path = require('path');
 const config = require('../config');
 const { nanoid } = require('nanoid');
 const ffmpeg = require('fluent-ffmpeg');
+const { fileManager } = require('../utils/systemUtils');
+
+// FFmpeg filter chains for the simplified stems
+const STEM_FILTERS = {
+  // Vocals - focus on mid frequencies
+  vocals: 'bandpass=f=2000:width_type=h:width=4800,acompressor=threshold=-20dB:ratio=4:attack=20:release=100',
+  // Drums - focus on transients
+  drums: 'highpass=f=200,lowpass=f=8000,acompressor=threshold=-15dB:ratio=5:attack=5:release=50',
+  // Bass - focus on low frequencies
+  bass: 'lowpass=f=250,acompressor=threshold=-10dB:ratio=6:attack=10:release=80',
+  // Other - everything else
+  other: 'bandreject=f=2000:width_type=h:width=4800,bandreject=f=100:width_type=h:width=300'
+};
 
 // Flag to track whether we prefer lightweight mode
 let preferLightweightMode = false;
@@ -79,7 +92,7 @@ async function separateTracks(filePath, options = {}) {
       if (!fs.existsSync(cacheDir)) {
         fs.mkdirSync(cacheDir, { recursive: true });
       }
-      const fileHash = path.basename(filePath).split('.')[0]; // Simple caching by filename
+      const fileHash = await fileManager.hashFile(filePath); // Cache by content, so renamed uploads still hit
       opts.cachePath = path.join(cacheDir, `stems_${fileHash}.json`);
     }
     
@@ -134,7 +147,7 @@ async function createSimplifiedStemsWithFFmpeg(filePath, outputDir) {
       }
       
       // Base filename without extension
-      const baseFilename = path.basename(filePath).split('.')[0];
+      const baseFilename = path.parse(filePath).name;
       const stemDir = path.join(outputDir, baseFilename);
       
       // Create stem directory if it doesn't exist
@@ -150,75 +163,34 @@ async function createSimplifiedStemsWithFFmpeg(filePath, outputDir) {
         other: path.join(stemDir, 'other.mp3')
       };
       
-      // Process each stem
-      const stemPromises = [
-        // Vocals - focus on mid frequencies
-        new Promise((resolveVocal) => {
-          ffmpeg(filePath)
-            .outputOptions(['-af', 'bandpass=f=2000:width_type=h:width=4800,acompressor=threshold=-20dB:ratio=4:attack=20:release=100'])
-            .audioCodec('libmp3lame')
-            .audioBitrate('192k')
-            .on('error', (err) => {
-              console.error('Error creating vocal stem:', err);
-              // Create empty file as fallback
-              fs.writeFileSync(stems.vocals, '');
-              resolveVocal();
-            })
-            .on('end', resolveVocal)
-            .save(stems.vocals);
-        }),
-        
-        // Drums - focus on transients
-        new Promise((resolveDrums) => {
-          ffmpeg(filePath)
-            .outputOptions(['-af', 'highpass=f=200,lowpass=f=8000,acompressor=threshold=-15dB:ratio=5:attack=5:release=50'])
-            .audioCodec('libmp3lame')
-            .audioBitrate('192k')
-            .on('error', (err) => {
-              console.error('Error creating drums stem:', err);
-              // Create empty file as fallback
-              fs.writeFileSync(stems.drums, '');
-              resolveDrums();
-            })
-            .on('end', resolveDrums)
-            .save(stems.drums);
-        }),
-        
-        // Bass - focus on low frequencies
-        new Promise((resolveBass) => {
-          ffmpeg(filePath)
-            .outputOptions(['-af', 'lowpass=f=250,acompressor=threshold=-10dB:ratio=6:attack=10:release=80'])
+      // Decode the input once and fan it out to every stem's filter chain,
+      // writing all four MP3s from a single ffmpeg process
+      const stemTypes = Object.keys(stems);
+      const graph = [`[0:a]asplit=${stemTypes.length}${stemTypes.map(stem => `[${stem}_in]`).join('')}`]
+        .concat(stemTypes.map(stem => `[${stem}_in]${STEM_FILTERS[stem]}[${stem}]`))
+        .join(';');
+      
+      await new Promise((resolveStems) => {
+        const command = ffmpeg(filePath).complexFilter(graph);
+        for (const stem of stemTypes) {
+          command.output(stems[stem])
+            .outputOptions(['-map', `[${stem}]`])
             .audioCodec('libmp3lame')
-            .audioBitrate('192k')
-            .on('error', (err) => {
-              console.error('Error creating bass stem:', err);
-              // Create empty file as fallback
-              fs.writeFileSync(stems.bass, '');
-              resolveBass();
-            })
-            .on('end', resolveBass)
-            .save(stems.bass);
-        }),
+            .audioBitrate('192k');
+        }
         
-        // Other - everything else
-        new Promise((resolveOther) => {
-          ffmpeg(filePath)
-            .outputOptions(['-af', 'bandreject=f=2000:width_type=h:width=4800,bandreject=f=100:width_type=h:width=300'])
-            .audioCodec('libmp3lame')
-            .audioBitrate('192k')
-            .on('error', (err) => {
-              console.error('Error creating other stem:', err);
-              // Create empty file as fallback
-              fs.writeFileSync(stems.other, '');
-              resolveOther();
-            })
-            .on('end', resolveOther)
-            .save(stems.other);
-        })
-      ];
-      
-      // Wait for all stems to be created
-      await Promise.all(stemPromises);
+        command
+          .on('error', (err) => {
+            console.error('Error creating stems:', err);
+            // Create empty files as fallback
+            for (const stemPath of Object.values(stems)) {
+              fs.writeFileSync(stemPath, '');
+            }
+            resolveStems();
+          })
+          .on('end', resolveStems)
+          .run();
+      });
       
       resolve(stems);
     } catch (error) {
@@ -30,11 +30,39 @@ function validateStemPaths(stemPaths) {
     return false;
   }
   
-  // Check if all stem files exist
+  // Group the distinct stem files by directory. A directory holding several
+  // of them is listed once instead of stat-ing each file; a lone file (such
+  // as a stem that fell back to the original upload) is stat-ed, so the
+  // uploads directory is never listed
+  const filesByDir = new Map();
+  for (const stemPath of Object.values(stemPaths)) {
+    const dir = path.dirname(stemPath);
+    if (!filesByDir.has(dir)) {
+      filesByDir.set(dir, new Set());
+    }
+    filesByDir.get(dir).add(path.basename(stemPath));
+  }
+  
+  const dirEntries = new Map();
+  const stemExists = (stemPath) => {
+    const dir = path.dirname(stemPath);
+    if (filesByDir.get(dir).size < 2) {
+      return fs.existsSync(stemPath);
+    }
+    if (!dirEntries.has(dir)) {
+      try {
+        dirEntries.set(dir, new Set(fs.readdirSync(dir)));
+      } catch (error) {
+        dirEntries.set(dir, new Set());
+      }
+    }
+    return dirEntries.get(dir).has(path.basename(stemPath));
+  };
+  
   let allExist = true;
-  for (const [stem, path] of Object.entries(stemPaths)) {
-    if (!fs.existsSync(path)) {
-      console.error(`validateStemPaths: Stem file not found: ${stem} at ${path}`);
+  for (const [stem, stemPath] of Object.entries(stemPaths)) {
+    if (!stemExists(stemPath)) {
+      console.error(`validateStemPaths: Stem file not found: ${stem} at ${stemPath}`);
       allExist = false;
     }
   }
@@ -65,6 +65,9 @@ const config = {
   python: {
     path: process.env.PYTHON_PATH || 'python3',
     scriptDir: path.join(__dirname, 'python'),
+    // Persistent worker processes per Python worker script. Each analysis
+    // worker already spreads one file over up to 4 threads
+    workerPoolSize: parseInt(process.env.PYTHON_WORKER_POOL_SIZE || String(isLowResourceSystem ? 1 : Math.max(1, Math.min(4, Math.floor(cpuCount / 4)))), 10),
     fallbacks: {
       useFallbackAnalysis: process.env.USE_FALLBACK_ANALYSIS === 'true' || isLowResourceSystem,
       useLightStemSeparation: process.env.USE_LIGHT_STEM_SEPARATION === 'true' || isLowResourceSystem
@@ -8,6 +8,7 @@ const { mixTracks } = require('./mixing');
 const { analyzePrompt } = require('./promptAnalyzer');
 const config = require('./config');
 const { runSetup } = require('./setup');
+const { stopPythonWorkers } = require('./pythonBridge');
 
 // Run setup check before starting the server
 (async function() {
@@ -349,6 +350,16 @@ function startServer() {
     console.log(`Upload directory: ${config.fileStorage.uploadDir}`);
   });
 
+  // Shut down persistent Python workers with the server
+  process.on('exit', stopPythonWorkers);
+  for (const signal of ['SIGINT', 'SIGTERM']) {
+    process.on(signal, () => {
+      console.log(`Received ${signal}. Stopping Python workers...`);
+      stopPythonWorkers();
+      process.exit(0);
+    });
+  }
+
   return app;
 }
 
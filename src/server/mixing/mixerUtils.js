@@ -8,7 +8,35 @@ const fs = require('fs');
 const path = require('path');
 const ffmpeg = require('fluent-ffmpeg');
 const { nanoid } = require('nanoid');
-const { pathResolver } = require('../utils/systemUtils');
+const { pathResolver, getSystemResources } = require('../utils/systemUtils');
+
+// Hosts need this much RAM before intermediates go to the RAM-backed tmpfs
+const SHM_MIN_MEMORY_GB = 8;
+// ...and the tmpfs itself this much free space: a mix writes every stem,
+// processed and tempo-adjusted WAV plus the pre-effects mix there, and
+// containers cap /dev/shm (64MB under Docker) regardless of host RAM
+const SHM_MIN_FREE_GB = 2;
+
+/**
+ * Pick the base directory for mix intermediates
+ * @returns {string} /dev/shm on Linux hosts with enough RAM and free tmpfs space, else the configured temp dir
+ */
+function getDefaultTempBaseDir() {
+  const resources = getSystemResources();
+  const shmDir = pathResolver.getShmDir();
+  if (resources.platform === 'linux' && resources.totalMemoryGB >= SHM_MIN_MEMORY_GB && typeof fs.statfsSync === 'function') {
+    try {
+      fs.accessSync(shmDir, fs.constants.W_OK);
+      const { bavail, bsize } = fs.statfsSync(shmDir);
+      if (bavail * bsize >= SHM_MIN_FREE_GB * 1024 * 1024 * 1024) {
+        return shmDir;
+      }
+    } catch (error) {
+      // No writable tmpfs, fall through to the configured temp dir
+    }
+  }
+  return pathResolver.getTempDir();
+}
 
 /**
  * Create a temporary directory for the mix process
@@ -16,8 +44,10 @@ const { pathResolver } = require('../utils/systemUtils');
  * @returns {string} Path to created temp directory
  */
 function createTempDirectory(baseDir) {
-  // Create temporary working directory in a standardized location
-  const tempBaseDir = baseDir || pathResolver.getTempDir();
+  // Create temporary working directory in a standardized location. The
+  // intermediate stem and pre-effects WAVs are deleted after the mix, so
+  // keep them in RAM when the host can afford it
+  const tempBaseDir = baseDir || getDefaultTempBaseDir();
   const tempDir = path.join(tempBaseDir, 'mixify-tmp', nanoid());
   fs.mkdirSync(tempDir, { recursive: true });
   return tempDir;
@@ -6,7 +6,7 @@
 
 const path = require('path');
 const fs = require('fs');
-const { pathResolver } = require('../utils/systemUtils');
+const { pathResolver, fileManager } = require('../utils/systemUtils');
 
 /**
  * Creates a cache directory if it doesn't exist
@@ -24,12 +24,13 @@ function ensureCacheDirectory() {
  * Generate cache path for stem file
  * @param {string} trackPath Path to original audio track
  * @param {string} prefix Prefix for the cache file
- * @returns {string} Path to cache file
+ * @returns {Promise<string>} Path to cache file
  */
-function generateStemCachePath(trackPath, prefix = 'track') {
+async function generateStemCachePath(trackPath, prefix = 'track') {
   const cacheDir = ensureCacheDirectory();
-  const fileName = path.basename(trackPath).split('.')[0];
-  return path.join(cacheDir, `${prefix}_${fileName}_stems.json`);
+  // Key by content so re-uploads under another name reuse their stems
+  const fileHash = await fileManager.hashFile(trackPath);
+  return path.join(cacheDir, `${prefix}_${fileHash}_stems.json`);
 }
 
 /**
@@ -43,7 +43,7 @@ function createStemDirectories(tempDir) {
  */
 async function processTrackStems(trackPath, outputDir, settings, cachePrefix) {
   // Generate cache path and check if we have cached stems
-  const cachePath = generateStemCachePath(trackPath, cachePrefix);
+  const cachePath = await generateStemCachePath(trackPath, cachePrefix);
   const cachedStems = readStemsFromCache(cachePath);
   
   if (cachedStems) {
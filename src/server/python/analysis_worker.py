@@ -0,0 +1,46 @@
+
+#!/usr/bin/env python3
+import sys
+import os
+import json
+from analyze_audio import analyze_audio, write_json
+
+def handle_job(job):
+    """
+    Run one analysis job
+    
+    Args:
+        job: Dictionary with "id", "audio_path" and optional "light_mode"
+    
+    Returns:
+        dict: Response carrying the job id and either "result" or "error"
+    """
+    if not isinstance(job, dict):
+        return {"id": None, "error": "Job must be a JSON object."}
+    
+    job_id = job.get("id")
+    audio_path = job.get("audio_path")
+    
+    if not audio_path or not os.path.exists(audio_path):
+        return {"id": job_id, "error": f"File {audio_path} does not exist."}
+    
+    return {"id": job_id, "result": analyze_audio(audio_path, bool(job.get("light_mode")))}
+
+if __name__ == "__main__":
+    # Long-lived worker: librosa, numba and scipy are imported once and
+    # jobs arrive as one JSON object per line on stdin. Each job gets one
+    # JSON line back on stdout, in order.
+    sys.stderr.write("Analysis worker ready.\n")
+    
+    for line in sys.stdin:
+        line = line.strip()
+        if not line:
+            continue
+        
+        try:
+            job = json.loads(line)
+        except ValueError as e:
+            sys.stderr.write(f"Invalid job: {str(e)}\n")
+            continue
+        
+        write_json(handle_job(job))
@@ -3,14 +3,481 @@
 import sys
 import os
 import json
+import struct
 import numpy as np
+import scipy.fft
+import scipy.signal
 import librosa
+import soundfile as sf
+import audioread
 import traceback
+from joblib import Parallel, delayed
+from threadpoolctl import threadpool_limits
+from system_resources import get_cpu_count
+
+try:
+    # Serializes numpy arrays and scalars natively, without Python-level conversion
+    import orjson
+except ImportError:
+    orjson = None
+
+# Audio is decoded and analyzed in blocks of this many seconds so that peak
+# memory stays constant regardless of track length
+BLOCK_SECONDS = 30
+
+# sr=22050 is half of CD quality and sufficient for BPM, key, energy and
+# band analysis; every FFT downstream scales with the number of samples
+ANALYSIS_SR = 22050
+
+# FFT size shared by every spectral feature, with its periodic Hann window
+N_FFT = 2048
+FFT_WINDOW = scipy.signal.get_window('hann', N_FFT).astype(np.float32)
+
+# Resolution (in samples) of the amplitude envelope kept for the waveform
+ENVELOPE_STEP = 512
+
+# Waveform values returned for display in standard and light mode
+WAVEFORM_POINTS = 100
+LIGHT_WAVEFORM_POINTS = 50
+
+# Upper bound on blocks analyzed concurrently; each block in flight holds a
+# few tens of MB of spectrogram data
+MAX_ANALYSIS_JOBS = 4
+
+# librosa.beat.tempo's defaults: seconds of onset autocorrelation per
+# tempogram frame, and the log-normal tempo prior
+TEMPO_AC_SECONDS = 8.0
+TEMPO_START_BPM = 120.0
+TEMPO_STD_BPM = 1.0
+TEMPO_MAX_BPM = 320.0
+
+KEYS = ['C', 'C#', 'D', 'D#', 'E', 'F', 'F#', 'G', 'G#', 'A', 'A#', 'B']
+MODES = ['Major', 'Minor']
+
+def segment_means(y, step):
+    """
+    Mean absolute amplitude of consecutive `step`-sample segments
+    
+    Args:
+        y: Audio samples
+        step: Segment length in samples
+        
+    Returns:
+        np.ndarray: One value per segment, including a shorter trailing
+                    segment when the length is not an exact multiple
+    """
+    n = len(y) // step
+    # One reshape + reduction instead of a Python loop over segments
+    means = np.abs(y[:n * step]).reshape(n, step).mean(axis=1)
+    if len(y) > n * step:
+        means = np.append(means, np.abs(y[n * step:]).mean())
+    return means
+
+def downsample_waveform(y, points):
+    """
+    Reduce a signal to `points` mean-magnitude values for display
+    
+    Args:
+        y: Audio samples (or an amplitude envelope)
+        points: Number of segments to produce
+        
+    Returns:
+        np.ndarray: float32 mean absolute amplitude per segment, serialized
+                    directly by orjson without building a Python list
+    """
+    y = np.abs(y)
+    if len(y) < points:
+        return y.astype(np.float32)
+    
+    # Spread the remainder across segments so exactly `points` values come
+    # out, filled in place with one reduction over the segment boundaries
+    bounds = np.arange(points) * len(y) // points
+    waveform = np.empty(points, dtype=np.float32)
+    np.add.reduceat(y, bounds, out=waveform, dtype=np.float32)
+    waveform /= np.diff(np.append(bounds, len(y)))
+    return waveform
+
+def magnitude_spectrogram(y, hop_length, workers=-1):
+    """
+    Compute a float32 magnitude spectrogram with scipy's pocketfft
+    
+    Frames are strided views over the signal, so the only copy made is the
+    windowed frame matrix, and workers=-1 spreads the FFTs across CPU cores.
+    
+    Args:
+        y: Mono audio samples (at least N_FFT long)
+        hop_length: Samples between successive frames
+        workers: Number of FFT worker threads (-1 for all cores)
+        
+    Returns:
+        np.ndarray: (1 + N_FFT // 2, frames) magnitude spectrogram
+    """
+    y = np.asarray(y, dtype=np.float32)
+    frames = np.lib.stride_tricks.sliding_window_view(y, N_FFT)[::hop_length] * FFT_WINDOW
+    return np.abs(scipy.fft.rfft(frames, axis=-1, workers=workers)).T
+
+def band_means(bin_means):
+    """
+    Mean magnitude of the low (0-20%), mid (20-80%) and high (80-100%) bins
+    
+    Args:
+        bin_means: Mean magnitude of each frequency bin
+        
+    Returns:
+        tuple: (low, mid, high) band means, read off one cumulative sum
+    """
+    n = len(bin_means)
+    csum = np.concatenate(([0.0], np.cumsum(bin_means)))
+    i1 = int(n * 0.2)
+    i2 = int(n * 0.8)
+    return (
+        csum[i1] / i1,
+        (csum[i2] - csum[i1]) / (i2 - i1),
+        (csum[n] - csum[i2]) / (n - i2)
+    )
+
+def find_wav_pcm16_data(audio_path):
+    """
+    Locate the sample data of an uncompressed 16-bit PCM WAV file
+    
+    Args:
+        audio_path: Path to the audio file
+        
+    Returns:
+        tuple: (data_offset, frames, channels, sample_rate), or None if the
+               file is not a 16-bit PCM WAV
+    """
+    with open(audio_path, 'rb') as f:
+        header = f.read(12)
+        if len(header) < 12 or header[:4] != b'RIFF' or header[8:12] != b'WAVE':
+            return None
+        
+        fmt = None
+        while True:
+            chunk_header = f.read(8)
+            if len(chunk_header) < 8:
+                return None
+            chunk_id = chunk_header[:4]
+            chunk_size = struct.unpack('<I', chunk_header[4:])[0]
+            
+            if chunk_id == b'fmt ':
+                fmt = f.read(chunk_size)
+                if chunk_size % 2:
+                    f.seek(1, os.SEEK_CUR)
+            elif chunk_id == b'data':
+                if fmt is None or len(fmt) < 16:
+                    return None
+                audio_format, channels, sample_rate, _, _, bits = struct.unpack('<HHIIHH', fmt[:16])
+                # WAVE_FORMAT_EXTENSIBLE stores the real format in its sub-format GUID
+                if audio_format == 0xFFFE and len(fmt) >= 26:
+                    audio_format = struct.unpack('<H', fmt[24:26])[0]
+                if audio_format != 1 or bits != 16 or channels == 0:
+                    return None
+                data_offset = f.tell()
+                # Streamed WAVs may leave the size unset, so trust the file length
+                data_size = min(chunk_size, os.path.getsize(audio_path) - data_offset)
+                return data_offset, data_size // (2 * channels), channels, sample_rate
+            else:
+                f.seek(chunk_size + chunk_size % 2, os.SEEK_CUR)
+
+def iter_native_blocks(audio_path):
+    """
+    Read an audio file as BLOCK_SECONDS-long blocks at its native sample rate
+    
+    16-bit PCM WAV files are memory-mapped so the OS only pages in the block
+    being analyzed; everything else is streamed through soundfile, or
+    decoded through audioread when libsndfile can't read the container.
+    
+    Args:
+        audio_path: Path to the audio file
+        
+    Yields:
+        tuple: (block, native_sr, total_frames) where block is a
+               (frames, channels) int16 or float32 array
+    """
+    wav_layout = find_wav_pcm16_data(audio_path)
+    if wav_layout is not None:
+        data_offset, frames, channels, native_sr = wav_layout
+        if frames == 0:
+            return
+        pcm = np.memmap(audio_path, dtype='<i2', mode='r', offset=data_offset, shape=(frames, channels))
+        blocksize = native_sr * BLOCK_SECONDS
+        for start in range(0, frames, blocksize):
+            yield pcm[start:start + blocksize], native_sr, frames
+        return
+    
+    try:
+        f = sf.SoundFile(audio_path)
+    except RuntimeError:
+        # libsndfile can't open compressed containers such as AAC .m4a
+        # (sf.LibsndfileError subclasses RuntimeError), so decode those
+        # the way librosa.load falls back to
+        yield from iter_decoded_blocks(audio_path)
+        return
+    
+    with f:
+        for block in f.blocks(blocksize=f.samplerate * BLOCK_SECONDS, dtype='float32', always_2d=True):
+            yield block, f.samplerate, f.frames
+
+def iter_decoded_blocks(audio_path):
+    """
+    Decode an audio file libsndfile can't open through audioread (ffmpeg)
+    
+    Args:
+        audio_path: Path to the audio file
+        
+    Yields:
+        tuple: (block, native_sr, total_frames) where block is a
+               (frames, channels) int16 array
+    """
+    with audioread.audio_open(audio_path) as f:
+        native_sr, channels = f.samplerate, f.channels
+        total_frames = int(round(f.duration * native_sr))
+        block_bytes = native_sr * BLOCK_SECONDS * channels * 2
+        pending = bytearray()
+        for buf in f:
+            pending += buf
+            while len(pending) >= block_bytes:
+                yield np.frombuffer(pending[:block_bytes], dtype='<i2').reshape(-1, channels), native_sr, total_frames
+                del pending[:block_bytes]
+        # Drop any partial trailing frame before the final block
+        pending = pending[:len(pending) - len(pending) % (2 * channels)]
+        if pending:
+            yield np.frombuffer(pending, dtype='<i2').reshape(-1, channels), native_sr, total_frames
+
+def iter_audio_blocks(audio_path, light_mode=False):
+    """
+    Decode an audio file as a stream of mono float32 blocks at ANALYSIS_SR
+    
+    Args:
+        audio_path: Path to the audio file
+        light_mode: If True, decimates files longer than a minute further
+        
+    Yields:
+        tuple: (block, sr, sum_sq, samples) for each BLOCK_SECONDS-long block,
+               where sum_sq is the sum of squared native-rate mono samples
+    """
+    sr = ANALYSIS_SR
+    for block, native_sr, total_frames in iter_native_blocks(audio_path):
+        # Further downsample for very resource-constrained environments
+        decimation = 1
+        if light_mode and total_frames > native_sr * 60:  # If longer than 1 minute
+            decimation = 2  # Skip every other sample
+        
+        # Downmix to mono, taking the energy sum from the native-rate samples
+        if block.dtype == np.int16:
+            # Stay in integer arithmetic for the energy pass over PCM data:
+            # the channel average fits int16 range, so its square fits int32
+            if block.shape[1] == 1:
+                mono = block[:, 0].astype(np.int32)
+            else:
+                mono = block.sum(axis=1, dtype=np.int32) // block.shape[1]
+            sum_sq = int(np.square(mono).sum(dtype=np.int64)) / (32768 ** 2)
+            block = mono.astype(np.float32) * (1 / 32768)
+        else:
+            block = block.mean(axis=1)
+            sum_sq = float(np.dot(block, block))
+        samples = len(block)
+        
+        if sr != native_sr:
+            block = librosa.resample(block, orig_sr=native_sr, target_sr=sr, res_type='kaiser_fast')
+        if decimation > 1:
+            block = block[::decimation]
+        yield block, sr // decimation, sum_sq, samples
+
+def analyze_block(y, sr, light_mode=False, first_block=False, fft_workers=-1):
+    """
+    Extract partial statistics from one block of audio
+    
+    Args:
+        y: Mono audio samples for the block
+        sr: Sample rate of the block
+        light_mode: If True, skips the spectrum bands and most of the centroid work
+        first_block: Whether this is the first block of the file
+        fft_workers: FFT worker threads for the block's spectrogram
+        
+    Returns:
+        dict: Running sums that analyze_audio combines across blocks
+    """
+    # 256 at 22050Hz keeps the onset frame rate (and so the BPM resolution)
+    # of the old 512 hop at 44.1kHz
+    hop_length = 256 if not light_mode else 1024
+    
+    stats = {
+        "envelope": segment_means(y, ENVELOPE_STEP),
+        # Clips too short to give WAVEFORM_POINTS envelope segments are drawn
+        # from their samples instead
+        "short_y": y if len(y) < ENVELOPE_STEP * WAVEFORM_POINTS else None,
+        "onset_env": None,
+        "chroma": None,
+        "centroid_sum": 0.0,
+        "centroid_frames": 0,
+        "bin_sums": None,
+        "band_frames": 0
+    }
+    
+    # Too short for a meaningful spectral frame (e.g. the tail of a file)
+    if len(y) < N_FFT:
+        return stats
+    
+    # One shared spectrogram feeds every spectral feature below
+    mag = magnitude_spectrogram(y, hop_length, workers=fft_workers)
+    S_power = mag ** 2
+    
+    # Onset envelope for BPM detection, continued across blocks. A mel
+    # projection of the shared spectrogram matches onset_strength's default input
+    mel_db = librosa.power_to_db(librosa.feature.melspectrogram(S=S_power, sr=sr))
+    stats["onset_env"] = librosa.onset.onset_strength(
+        S=mel_db, sr=sr, hop_length=hop_length, aggregate=np.median
+    )
+    
+    # Key detection - only the argmax pitch class is used, so chroma_stft on
+    # the shared spectrogram is enough and avoids a separate CQT
+    chroma = librosa.feature.chroma_stft(S=S_power, sr=sr)
+    stats["chroma"] = np.sum(chroma, axis=1)
+    
+    # Clarity/brightness calculation based on spectral centroid
+    if light_mode:
+        # Use a smaller portion of the audio for spectral centroid
+        mag_segment = mag[:, :sr * 10 // hop_length + 1] if first_block else None  # Just use first 10 seconds
+    else:
+        mag_segment = mag
+    if mag_segment is not None:
+        centroid = librosa.feature.spectral_centroid(S=mag_segment, sr=sr)
+        stats["centroid_sum"] = float(np.sum(centroid))
+        stats["centroid_frames"] = centroid.shape[-1]
+    
+    # Extract frequency spectrum - optional for light mode
+    if not light_mode:
+        # Per-bin magnitude sums in a single pass; the bands are split out of
+        # them once all blocks are in. The ratios only need mean magnitudes, so
+        # the full mix is used directly rather than an HPSS harmonic component
+        stats["bin_sums"] = mag.sum(axis=1, dtype=np.float64)
+        stats["band_frames"] = mag.shape[1]
+    
+    return stats
+
+def edge_ramp(edge, width, side):
+    """
+    The linear ramp librosa's centered tempogram pads an onset envelope with
+    
+    Args:
+        edge: First (side='before') or last (side='after') onset value
+        width: Number of padding frames
+        side: Which end of the envelope the ramp pads
+        
+    Returns:
+        np.ndarray: `width` frames ramping between zero and `edge`
+    """
+    pad = (width, 0) if side == 'before' else (0, width)
+    ramp = np.pad(np.array([edge], dtype=np.float32), pad, mode='linear_ramp', end_values=0)
+    return ramp[:width] if side == 'before' else ramp[1:]
+
+def tempogram_sum(onset_env, win_length, max_frames=None):
+    """
+    Sum over frames of the autocorrelation tempogram of an onset envelope
+    
+    Only complete windows are used, so consecutive calls over overlapping
+    pieces of one envelope (each starting win_length - 1 frames before the
+    previous piece ended) add up to the tempogram of the whole envelope
+    without ever holding it in memory.
+    
+    Args:
+        onset_env: Onset strength frames, including any carried-over context
+        win_length: Autocorrelation window in frames
+        max_frames: Upper bound on the number of windows to use
+        
+    Returns:
+        tuple: (sum of the tempogram columns, number of columns)
+    """
+    frames = len(onset_env) - win_length + 1
+    if max_frames is not None:
+        frames = min(frames, max_frames)
+    if frames <= 0:
+        return np.zeros(win_length), 0
+    
+    tempogram = librosa.feature.tempogram(
+        onset_envelope=onset_env[:frames + win_length - 1], win_length=win_length, center=False
+    )
+    return tempogram.sum(axis=1), frames
+
+def estimate_tempo(tempogram_mean, sr, hop_length):
+    """
+    Pick the tempo from a mean tempogram the way librosa.beat.tempo does
+    
+    Args:
+        tempogram_mean: Mean autocorrelation per lag over the whole track
+        sr: Sample rate of the onset envelope
+        hop_length: Samples between onset frames
+        
+    Returns:
+        float: Tempo in BPM
+    """
+    bpms = librosa.tempo_frequencies(len(tempogram_mean), sr=sr, hop_length=hop_length)
+    
+    # Log-normal prior around TEMPO_START_BPM, with everything above
+    # TEMPO_MAX_BPM excluded
+    with np.errstate(divide='ignore'):
+        logprior = -0.5 * ((np.log2(bpms) - np.log2(TEMPO_START_BPM)) / TEMPO_STD_BPM) ** 2
+    logprior[:np.argmax(bpms < TEMPO_MAX_BPM)] = -np.inf
+    
+    return bpms[np.argmax(np.log1p(1e6 * tempogram_mean) + logprior)]
+
+def get_analysis_jobs(light_mode=False):
+    """Number of blocks to analyze concurrently, based on the CPU count from the server"""
+    if light_mode:
+        return 1
+    cpu_count = int(os.environ.get('CPU_COUNT') or get_cpu_count())
+    return max(1, min(MAX_ANALYSIS_JOBS, cpu_count))
+
+def analyze_blocks(audio_path, light_mode=False, n_jobs=1):
+    """
+    Run analyze_block over every block of an audio file
+    
+    With n_jobs > 1 blocks are analyzed in a thread pool; the FFT, BLAS and
+    numba kernels doing the work release the GIL. BLAS and FFT are kept to
+    one thread per block so the pool does not oversubscribe the CPU.
+    
+    Args:
+        audio_path: Path to the audio file
+        light_mode: If True, uses less memory and CPU at the cost of some accuracy
+        n_jobs: Number of blocks to analyze concurrently
+        
+    Returns:
+        list: Per-block statistics in file order, each including the block's
+              sample rate and energy sums
+    """
+    fft_workers = -1 if n_jobs == 1 else 1
+    
+    def run_block(i, block, sr, sum_sq, samples):
+        stats = analyze_block(block, sr, light_mode, first_block=(i == 0), fft_workers=fft_workers)
+        stats.update(sr=sr, sum_sq=sum_sq, samples=samples)
+        return stats
+    
+    blocks = enumerate(iter_audio_blocks(audio_path, light_mode))
+    if n_jobs == 1:
+        return [run_block(i, *block) for i, block in blocks]
+    
+    with threadpool_limits(limits=1, user_api='blas'):
+        return Parallel(n_jobs=n_jobs, prefer='threads')(
+            delayed(run_block)(i, *block) for i, block in blocks
+        )
+
+def write_json(result):
+    """Write a result to stdout as a single JSON line"""
+    if orjson is not None:
+        sys.stdout.buffer.write(orjson.dumps(result, option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_APPEND_NEWLINE))
+        sys.stdout.flush()
+    else:
+        print(json.dumps(result, default=lambda value: value.tolist()))
 
 def analyze_audio(audio_path, light_mode=False):
     """
     Analyze audio file using librosa to extract features
     
+    The file is streamed in BLOCK_SECONDS blocks and every feature is
+    accumulated incrementally, so memory use does not grow with duration.
+    
     Args:
         audio_path: Path to the audio file
         light_mode: If True, uses less memory and CPU at the cost of some accuracy
@@ -19,87 +486,101 @@ def analyze_audio(audio_path, light_mode=False):
         dict: Dictionary containing audio features
     """
     try:
-        # Load audio file with memory optimization if light_mode is enabled
-        # sr=22050 is half of CD quality and sufficient for most analysis
-        if light_mode:
-            # Use lower sample rate and mono for better performance
-            y, sr = librosa.load(audio_path, sr=22050, mono=True, res_type='kaiser_fast')
-            # Further downsample for very resource-constrained environments
-            if len(y) > sr * 60:  # If longer than 1 minute
-                hop_length = 2  # Skip every other sample
-                y = y[::hop_length]
-                sr = sr // hop_length
-        else:
-            y, sr = librosa.load(audio_path, sr=None)
+        hop_length = 256 if not light_mode else 1024
         
-        # Extract features - BPM detection with optimized hop_length
-        hop_length = 512 if not light_mode else 1024
-        tempo, _ = librosa.beat.beat_track(y=y, sr=sr, hop_length=hop_length)
+        sum_sq = 0.0
+        samples = 0
+        envelopes = []
+        short_ys = []
+        # Running tempogram sum; onset_tail holds the frames the next block's
+        # autocorrelation windows still need
+        tempo_sum = None
+        tempo_frames = 0
+        onset_frames = 0
+        onset_tail = None
+        key_indices = np.zeros(12)
+        centroid_sum = 0.0
+        centroid_frames = 0
+        bin_sums = None
+        band_frames = 0
+        sr = None
         
-        # Key detection with optimized size
-        chroma_hop_length = 512 if not light_mode else 2048
-        chroma = librosa.feature.chroma_cqt(y=y, sr=sr, hop_length=chroma_hop_length)
-        key_indices = np.sum(chroma, axis=1)
-        key_idx = np.argmax(key_indices)
+        for stats in analyze_blocks(audio_path, light_mode, n_jobs=get_analysis_jobs(light_mode)):
+            sr = stats["sr"]
+            sum_sq += stats["sum_sq"]
+            samples += stats["samples"]
+            envelopes.append(stats["envelope"])
+            if stats["short_y"] is not None:
+                short_ys.append(stats["short_y"])
+            if stats["onset_env"] is not None:
+                onset_env = stats["onset_env"]
+                if onset_tail is None:
+                    win_length = librosa.time_to_frames(TEMPO_AC_SECONDS, sr=sr, hop_length=hop_length).item()
+                    tempo_sum = np.zeros(win_length)
+                    onset_tail = edge_ramp(onset_env[0], win_length // 2, 'before')
+                onset_tail = np.concatenate((onset_tail, onset_env))
+                block_sum, frames = tempogram_sum(onset_tail, win_length)
+                tempo_sum += block_sum
+                tempo_frames += frames
+                onset_frames += len(onset_env)
+                onset_tail = onset_tail[frames:]
+                key_indices += stats["chroma"]
+            centroid_sum += stats["centroid_sum"]
+            centroid_frames += stats["centroid_frames"]
+            if stats["bin_sums"] is not None:
+                bin_sums = stats["bin_sums"] if bin_sums is None else bin_sums + stats["bin_sums"]
+                band_frames += stats["band_frames"]
+        
+        if onset_tail is None:
+            raise ValueError("Audio is too short to analyze")
+        
+        # Extract features - BPM detection with optimized hop_length. The
+        # tempogram was summed block by block, so only the windows over the
+        # end of the track are left; as in librosa.beat.tempo, only the
+        # tempo is needed and the beat-tracking pass is skipped
+        onset_tail = np.concatenate((onset_tail, edge_ramp(onset_tail[-1], win_length // 2, 'after')))
+        block_sum, frames = tempogram_sum(onset_tail, win_length, max_frames=onset_frames - tempo_frames)
+        tempo_sum += block_sum
+        tempo_frames += frames
+        tempo = estimate_tempo(tempo_sum / tempo_frames, sr, hop_length)
         
         # Map key index to actual key
-        keys = ['C', 'C#', 'D', 'D#', 'E', 'F', 'F#', 'G', 'G#', 'A', 'A#', 'B']
-        modes = ['Major', 'Minor']
+        key_idx = np.argmax(key_indices)
         
         # Simplified key detection
-        key = keys[key_idx]
+        key = KEYS[key_idx]
         
         # Determine if major or minor
         minor_third = (key_idx + 3) % 12
         major_third = (key_idx + 4) % 12
         
         if key_indices[minor_third] > key_indices[major_third]:
-            mode = modes[1]  # Minor
-        else:
-            mode = modes[0]  # Major
-            
-        # Energy calculation with optional downsampling
-        if light_mode and len(y) > sr * 30:  # For files > 30 seconds
-            # Take samples at regular intervals
-            sample_interval = len(y) // 1000
-            y_sampled = y[::sample_interval]
-            energy = np.mean(librosa.feature.rms(y=y_sampled))
+            mode = MODES[1]  # Minor
         else:
-            energy = np.mean(librosa.feature.rms(y=y))
+            mode = MODES[0]  # Major
             
+        # Energy calculation from the running sum of squares
+        energy = np.sqrt(sum_sq / samples)
         energy_normalized = min(1.0, energy * 10) # Scale to 0-1 range
         
-        # Clarity/brightness calculation based on spectral centroid
-        if light_mode:
-            # Use a smaller portion of the audio for spectral centroid
-            y_segment = y[:min(len(y), sr * 10)]  # Just use first 10 seconds
-            spectral_centroid = np.mean(librosa.feature.spectral_centroid(y=y_segment, sr=sr))
-        else:
-            spectral_centroid = np.mean(librosa.feature.spectral_centroid(y=y, sr=sr))
-            
+        spectral_centroid = centroid_sum / centroid_frames if centroid_frames else 0.0
         clarity = min(1.0, spectral_centroid / 5000)  # Normalize to 0-1 range
         
         # Extract waveform visualization data (downsampled)
-        waveform = []
         # For light mode, create an even smaller waveform representation
-        points = 50 if light_mode else 100
-        step = max(1, len(y) // points)
-        for i in range(0, len(y), step):
-            segment = y[i:i+step]
-            if len(segment) > 0:
-                waveform.append(float(np.abs(segment).mean()))
+        points = LIGHT_WAVEFORM_POINTS if light_mode else WAVEFORM_POINTS
+        envelope = np.concatenate(envelopes)
+        if len(envelope) < points:
+            # Only a clip of a couple of seconds is this short, and all of it
+            # was a single short block
+            envelope = np.concatenate(short_ys)
+        waveform = downsample_waveform(envelope, points)
         
         # Extract frequency spectrum - optional for light mode
         spectrum = {}
-        if not light_mode:
-            # Use HPSS for separating harmonic and percussive components
-            y_harmonic, y_percussive = librosa.effects.hpss(y)
-            
+        if band_frames:
             # Divide spectrum into bands
-            spec = np.abs(librosa.stft(y_harmonic))
-            low_band = np.mean(spec[:int(spec.shape[0]*0.2), :])
-            mid_band = np.mean(spec[int(spec.shape[0]*0.2):int(spec.shape[0]*0.8), :])
-            high_band = np.mean(spec[int(spec.shape[0]*0.8):, :])
+            low_band, mid_band, high_band = band_means(bin_sums / band_frames)
             
             # Normalize bands
             total = low_band + mid_band + high_band
@@ -116,14 +597,6 @@ def analyze_audio(audio_path, light_mode=False):
             spectrum['low'] = 0.33
             spectrum['mid'] = 0.33
             spectrum['high'] = 0.33
-        
-        # Clear memory explicitly
-        del y
-        if 'y_harmonic' in locals():
-            del y_harmonic
-            del y_percussive
-        if 'spec' in locals():
-            del spec
             
         # Return analysis results
         return {
@@ -147,7 +620,7 @@ def analyze_audio(audio_path, light_mode=False):
             "key": "C Major",
             "energy": 0.5,
             "clarity": 0.5,
-            "waveform": [0.5] * (50 if light_mode else 100),
+            "waveform": [0.5] * (LIGHT_WAVEFORM_POINTS if light_mode else WAVEFORM_POINTS),
             "spectrum": {"low": 0.33, "mid": 0.33, "high": 0.33},
             "light_mode": light_mode,
             "error": str(e)
@@ -173,4 +646,4 @@ if __name__ == "__main__":
     result = analyze_audio(audio_path, light_mode)
     
     # Output JSON result to stdout
-    print(json.dumps(result))
+    write_json(result)
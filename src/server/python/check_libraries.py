@@ -1,17 +1,31 @@
 
 #!/usr/bin/env python3
+import os
 import sys
 import json
+import hashlib
+import sysconfig
+import tempfile
+import importlib
 import importlib.util
+import importlib.metadata
+
+# Results are reused until the interpreter or its site-packages change
+CACHE_PATH = os.path.join(tempfile.gettempdir(), '.libcheck.json')
 
 def check_library(library_name):
-    """Check if a library is installed and importable"""
+    """Check if a library is installed and report its version"""
     try:
         spec = importlib.util.find_spec(library_name)
         if spec is None:
             return False
-        lib = importlib.import_module(library_name)
-        version = getattr(lib, '__version__', 'unknown')
+        # Read the version from the installed metadata instead of importing
+        # the package, which costs seconds for librosa/demucs
+        try:
+            version = importlib.metadata.version(library_name)
+        except importlib.metadata.PackageNotFoundError:
+            lib = importlib.import_module(library_name)
+            version = getattr(lib, '__version__', 'unknown')
         return {
             'installed': True,
             'version': version
@@ -24,6 +38,36 @@ def check_library(library_name):
             'error': str(e)
         }
 
+def get_cache_key(libraries):
+    """Build a key that changes whenever a package is installed or removed"""
+    parts = [sys.version, sys.executable, ','.join(libraries)]
+    paths = sysconfig.get_paths()
+    for site_dir in sorted({paths['purelib'], paths['platlib']}):
+        if os.path.isdir(site_dir):
+            parts.append(f"{site_dir}:{os.path.getmtime(site_dir)}")
+    return hashlib.md5('|'.join(parts).encode()).hexdigest()
+
+def load_cached_results(key):
+    """Return cached results for this key, or None"""
+    try:
+        with open(CACHE_PATH, 'r') as f:
+            cached = json.load(f)
+        if cached.get('key') == key:
+            return cached.get('results')
+    except (OSError, ValueError):
+        pass
+    return None
+
+def save_cached_results(key, results):
+    """Atomically write results to the cache file, ignoring failures"""
+    try:
+        fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(CACHE_PATH), suffix='.tmp')
+        with os.fdopen(fd, 'w') as f:
+            json.dump({'key': key, 'results': results}, f)
+        os.replace(temp_path, CACHE_PATH)
+    except OSError as e:
+        sys.stderr.write(f"Could not cache library check results: {str(e)}\n")
+
 if __name__ == "__main__":
     # Define libraries to check
     libraries = [
@@ -36,10 +80,15 @@ if __name__ == "__main__":
         'tqdm'
     ]
     
-    # Check each library
-    results = {}
-    for lib in libraries:
-        results[lib] = check_library(lib)
+    cache_key = get_cache_key(libraries)
+    results = load_cached_results(cache_key)
+    
+    if results is None:
+        # Check each library
+        results = {}
+        for lib in libraries:
+            results[lib] = check_library(lib)
+        save_cached_results(cache_key, results)
     
     # Print results as JSON
     print(json.dumps(results))
@@ -50,7 +99,7 @@ if __name__ == "__main__":
         sys.stderr.write(f"Missing libraries: {', '.join(missing)}\n")
     else:
         sys.stderr.write("All required libraries are installed.\n")
-
+    
     # Exit with error code if critical libraries are missing
     critical = ['numpy', 'librosa', 'soundfile']
     critical_missing = [lib for lib in critical if lib in missing]
@@ -2,7 +2,8 @@
 #!/usr/bin/env python3
 import os
 import sys
-import subprocess
+import shutil
+from process_utils import run_ffmpeg
 
 def create_fallback_stems(audio_path, output_dir, base_filename, light_mode):
     """Create fallback stems when spleeter fails"""
@@ -15,19 +16,27 @@ def create_fallback_stems(audio_path, output_dir, base_filename, light_mode):
     stems_dir = os.path.join(output_dir, base_filename)
     os.makedirs(stems_dir, exist_ok=True)
     
+    # Use simpler ffmpeg settings for fallback
+    bitrate = "64k" if light_mode else "128k"
+    
+    # Every fallback stem is the same re-encode of the original, so encode it
+    # once and copy the result for the remaining stems
+    encoded_path = None
+    
     for stem_type in stem_types:
         fallback_path = os.path.join(stems_dir, f"{stem_type}.mp3")
         
-        # Use simpler ffmpeg settings for fallback
-        bitrate = "64k" if light_mode else "128k"
-        
         try:
-            # Copy original file as fallback
-            subprocess.run([
-                "ffmpeg", "-i", audio_path,
-                "-codec:a", "libmp3lame", "-b:a", bitrate,
-                "-y", fallback_path
-            ], check=True, stderr=subprocess.PIPE)
+            if encoded_path is None:
+                # Copy original file as fallback
+                run_ffmpeg([
+                    "-i", audio_path,
+                    "-codec:a", "libmp3lame", "-b:a", bitrate,
+                    "-y", fallback_path
+                ])
+                encoded_path = fallback_path
+            else:
+                shutil.copyfile(encoded_path, fallback_path)
             
             fallback_stems[stem_type] = fallback_path
         except Exception as e:
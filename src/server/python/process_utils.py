@@ -0,0 +1,66 @@
+
+#!/usr/bin/env python3
+import os
+import sys
+import signal
+import subprocess
+from system_resources import get_cpu_count
+
+IS_LINUX = sys.platform.startswith("linux")
+
+# prctl option asking the kernel to signal the child when its parent dies
+PR_SET_PDEATHSIG = 1
+
+# ffmpeg only reports errors, which reach the server's stderr log next to
+# the CalledProcessError raised for the non-zero exit
+FFMPEG_QUIET_ARGS = ["-hide_banner", "-loglevel", "error", "-nostats"]
+
+# Let ffmpeg spread decoding and filter graphs over every core. CPU_COUNT
+# is set by the Node side from its system resource probe; run standalone,
+# only the CPUs this process may use are counted
+FFMPEG_CPU_COUNT = os.environ.get("CPU_COUNT") or str(get_cpu_count())
+FFMPEG_THREAD_ARGS = ["-threads", "0", "-filter_threads", FFMPEG_CPU_COUNT, "-filter_complex_threads", FFMPEG_CPU_COUNT]
+
+def load_prctl():
+    """Return libc's prctl on Linux, or None where it is unavailable"""
+    if not IS_LINUX:
+        return None
+    try:
+        import ctypes
+        return ctypes.CDLL("libc.so.6", use_errno=True).prctl
+    except (OSError, AttributeError):
+        return None
+
+PRCTL = load_prctl()
+
+def set_parent_death_signal():
+    """Runs in the child before exec: terminate it if this process dies first"""
+    PRCTL(PR_SET_PDEATHSIG, signal.SIGTERM)
+
+def run_command(argv, timeout=None):
+    """
+    Run a child process to completion
+    
+    stdin is closed and stderr is shared with this process, so the child's
+    error output lands in the server log. A non-zero exit raises
+    CalledProcessError, and on Linux the child is killed if this process
+    dies so no orphaned ffmpeg keeps running.
+    
+    Args:
+        argv: Command and arguments
+        timeout: Optional limit in seconds, raising TimeoutExpired
+        
+    Returns:
+        subprocess.CompletedProcess: The finished process
+    """
+    return subprocess.run(
+        argv,
+        stdin=subprocess.DEVNULL,
+        check=True,
+        timeout=timeout,
+        preexec_fn=set_parent_death_signal if PRCTL else None
+    )
+
+def run_ffmpeg(args, timeout=None):
+    """Run ffmpeg quietly on every core with the given arguments"""
+    return run_command(["ffmpeg", *FFMPEG_QUIET_ARGS, *FFMPEG_THREAD_ARGS, *args], timeout=timeout)
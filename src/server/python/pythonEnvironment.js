@@ -11,6 +11,7 @@ const { spawn } = require('cross-spawn');
 
 // Cache Python environment compatibility
 let pythonEnvChecked = false;
+let pythonEnvCheckPromise = null;
 let pythonPath = process.env.PYTHON_PATH || 'python3';
 let pythonHasLibrosa = false;
 let pythonHasDemucs = false;
@@ -28,6 +29,21 @@ async function checkPythonEnvironment() {
     };
   }
   
+  // Concurrent callers (e.g. analysis and stem separation of two tracks)
+  // share one check instead of each spawning the probe interpreters
+  if (!pythonEnvCheckPromise) {
+    pythonEnvCheckPromise = detectPythonEnvironment().finally(() => {
+      pythonEnvCheckPromise = null;
+    });
+  }
+  return pythonEnvCheckPromise;
+}
+
+/**
+ * Find a working Python interpreter and check its dependencies
+ * @returns {Promise<Object>} Environment info
+ */
+async function detectPythonEnvironment() {
   console.log('Checking Python environment...');
   
   // Try several Python commands to find a working one
@@ -77,6 +93,7 @@ async function checkAndInstallPythonDependencies() {
   const checkScript = `
 import sys
 import importlib.util
+import importlib.metadata
 import json
 
 required_packages = [
@@ -95,12 +112,12 @@ for package in required_packages:
     }
     
     if is_installed:
+        # Read the version from package metadata; importing librosa and
+        # demucs (torch) here would cost seconds of startup per check
         try:
-            module = importlib.import_module(package)
-            if hasattr(module, "__version__"):
-                results[package]["version"] = module.__version__
-            else:
-                results[package]["version"] = "unknown"
+            results[package]["version"] = importlib.metadata.version(package)
+        except importlib.metadata.PackageNotFoundError:
+            results[package]["version"] = "unknown"
         except Exception as e:
             results[package]["error"] = str(e)
 
@@ -6,7 +6,7 @@
 
 const { PythonShell } = require('python-shell');
 const fs = require('fs');
-const { pathResolver, getSystemResources, calculateMemoryLimits } = require('../utils/systemUtils');
+const { pathResolver, getSystemResources } = require('../utils/systemUtils');
 
 // Cache for checking if Python scripts exist
 const scriptExistsCache = {};
@@ -31,6 +31,34 @@ function checkScriptExists(scriptPath) {
   return exists;
 }
 
+// Static part of the environment shared by every Python process, built on
+// first use
+let baseEnv = null;
+
+/**
+ * Get the environment variables passed to Python processes
+ * @param {Object} resources System resources sampled for this spawn
+ * @returns {Object} Environment for spawned Python processes
+ */
+function getPythonEnv(resources = getSystemResources()) {
+  if (!baseEnv) {
+    baseEnv = { ...process.env };
+    
+    // Bound glibc's malloc arenas before launch; threaded block analysis
+    // otherwise grows one arena per thread and concurrent scripts bloat RSS
+    baseEnv.MALLOC_ARENA_MAX = baseEnv.MALLOC_ARENA_MAX || '2';
+    baseEnv.CPU_COUNT = String(resources.cpuCount);
+  }
+  
+  // Pass system resources info to Python; free memory changes between
+  // spawns, so it is read fresh each time
+  return {
+    ...baseEnv,
+    SYSTEM_MEMORY_MB: String(resources.totalMemoryGB * 1024),
+    AVAILABLE_MEMORY_MB: String(resources.availableMemoryGB * 1024)
+  };
+}
+
 /**
  * Run a Python script with proper error handling
  * @param {string} scriptName Name of the Python script (without path)
@@ -48,28 +76,14 @@ async function runScript(scriptName, args = [], options = {}, pythonPath = 'pyth
       return reject(new Error(`Python script not found: ${scriptName} (looked in ${pathResolver.getPythonScriptDir()})`));
     }
     
-    // Get system resources and memory limits
+    // Get system resources
     const resources = getSystemResources();
-    const memoryLimits = calculateMemoryLimits();
-    
-    // Set memory limit for Python process
-    let memoryFlag = [];
-    if (resources.isLowResourceSystem) {
-      memoryFlag = [`-Xmx${memoryLimits.heapLimitMB}m`];
-    }
-    
-    // Set up environment variables for Python
-    const env = { ...process.env };
-    
-    // Pass system resources info to Python
-    env.SYSTEM_MEMORY_MB = String(resources.totalMemoryGB * 1024);
-    env.AVAILABLE_MEMORY_MB = String(resources.availableMemoryGB * 1024);
-    env.CPU_COUNT = String(resources.cpuCount);
+    const env = getPythonEnv(resources);
     
     const defaultOptions = {
       mode: 'text',
       pythonPath: pythonPath,
-      pythonOptions: ['-u', ...memoryFlag], // unbuffered output + memory limit
+      pythonOptions: ['-u'], // unbuffered output
       scriptPath: pathResolver.getPythonScriptDir(),
       args: args,
       env: env
@@ -129,28 +143,14 @@ async function runScriptWithProgress(scriptName, args = [], onProgress = null, o
       return reject(new Error(`Python script not found: ${scriptName} (looked in ${pathResolver.getPythonScriptDir()})`));
     }
     
-    // Get system resources and memory limits
+    // Get system resources
     const resources = getSystemResources();
-    const memoryLimits = calculateMemoryLimits();
-    
-    // Set memory limit for Python process
-    let memoryFlag = [];
-    if (resources.isLowResourceSystem) {
-      memoryFlag = [`-Xmx${memoryLimits.heapLimitMB}m`];
-    }
-    
-    // Set up environment variables for Python
-    const env = { ...process.env };
-    
-    // Pass system resources info to Python
-    env.SYSTEM_MEMORY_MB = String(resources.totalMemoryGB * 1024);
-    env.AVAILABLE_MEMORY_MB = String(resources.availableMemoryGB * 1024);
-    env.CPU_COUNT = String(resources.cpuCount);
+    const env = getPythonEnv(resources);
     
     const defaultOptions = {
       mode: 'text',
       pythonPath: pythonPath,
-      pythonOptions: ['-u', ...memoryFlag], // unbuffered output + memory limit 
+      pythonOptions: ['-u'], // unbuffered output
       scriptPath: pathResolver.getPythonScriptDir(),
       args: args,
       env: env
@@ -224,5 +224,6 @@ async function runScriptWithProgress(scriptName, args = [], onProgress = null, o
 module.exports = {
   runScript,
   runScriptWithProgress,
-  checkScriptExists
+  checkScriptExists,
+  getPythonEnv
 };
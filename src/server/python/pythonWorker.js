@@ -0,0 +1,212 @@
+
+/**
+ * Persistent Python worker module
+ * Keeps a pool of long-running Python processes alive so heavy imports
+ * (librosa, numba, scipy) are paid once per worker instead of once per request
+ */
+
+const { PythonShell } = require('python-shell');
+const { pathResolver, getSystemResources } = require('../utils/systemUtils');
+const { checkScriptExists, getPythonEnv } = require('./pythonExecutor');
+const config = require('../config');
+
+// Pools of running workers keyed by script name
+const pools = {};
+
+// Per-job time limits, counted from when a job reaches the front of its
+// worker's queue. They match runScript on limited hardware; elsewhere a
+// hung job would block every job queued behind it, so it gets the
+// runScriptWithProgress limit
+const LOW_RESOURCE_JOB_TIMEOUT = 300000; // 5 minutes
+const JOB_TIMEOUT = 600000; // 10 minutes
+
+/**
+ * Start a worker process for a Python script
+ * @param {string} scriptName Name of the worker script (without path)
+ * @param {string} pythonPath Path to Python executable
+ * @returns {Object} Worker state
+ */
+function startWorker(scriptName, pythonPath) {
+  const shell = new PythonShell(scriptName, {
+    mode: 'text',
+    pythonPath: pythonPath,
+    pythonOptions: ['-u'], // unbuffered output
+    scriptPath: pathResolver.getPythonScriptDir(),
+    env: getPythonEnv()
+  });
+  
+  // Jobs run one at a time in the order they were sent, so the first
+  // pending entry is the job that is running
+  const worker = {
+    shell,
+    scriptName,
+    pythonPath,
+    pending: new Map(),
+    nextId: 1,
+    timer: null
+  };
+  
+  console.log(`Started Python worker: ${scriptName}`);
+  
+  shell.on('message', (message) => {
+    let response;
+    try {
+      response = JSON.parse(message);
+    } catch (parseError) {
+      console.warn(`[Python ${scriptName}] unexpected output:`, message);
+      return;
+    }
+    
+    const job = worker.pending.get(response.id);
+    if (!job) {
+      return;
+    }
+    
+    worker.pending.delete(response.id);
+    if (response.error) {
+      job.reject(new Error(response.error));
+    } else {
+      job.resolve(response.result);
+    }
+    armJobTimer(worker);
+  });
+  
+  shell.on('stderr', (err) => {
+    console.warn(`[Python ${scriptName}]:`, err);
+  });
+  
+  // Fail any outstanding jobs and drop the worker from its pool so a
+  // replacement is started on demand
+  const stopWorker = (reason) => {
+    const pool = pools[scriptName] || [];
+    const index = pool.indexOf(worker);
+    if (index !== -1) {
+      pool.splice(index, 1);
+    }
+    clearTimeout(worker.timer);
+    for (const job of worker.pending.values()) {
+      job.reject(reason);
+    }
+    worker.pending.clear();
+  };
+  worker.stop = stopWorker;
+  
+  shell.on('error', (err) => {
+    console.error(`Error in Python worker ${scriptName}:`, err);
+    stopWorker(err);
+  });
+  
+  shell.on('close', () => {
+    console.warn(`Python worker ${scriptName} exited`);
+    stopWorker(new Error(`Python worker ${scriptName} exited`));
+  });
+  
+  return worker;
+}
+
+/**
+ * Start the time limit of the job at the front of a worker's queue
+ * A job that overruns can't be cancelled inside the worker, so the process
+ * is killed and the jobs still queued behind it move to a fresh worker
+ * @param {Object} worker Worker state
+ */
+function armJobTimer(worker) {
+  clearTimeout(worker.timer);
+  worker.timer = null;
+  
+  const head = worker.pending.entries().next();
+  if (head.done) {
+    return;
+  }
+  
+  const [id, job] = head.value;
+  const timeout = getSystemResources().isLowResourceSystem ? LOW_RESOURCE_JOB_TIMEOUT : JOB_TIMEOUT;
+  worker.timer = setTimeout(() => {
+    worker.pending.delete(id);
+    job.reject(new Error(`Python worker ${worker.scriptName} timed out after ${timeout / 1000}s`));
+    
+    const queued = [...worker.pending.values()];
+    worker.pending.clear();
+    worker.stop(new Error(`Python worker ${worker.scriptName} was killed after a job timed out`));
+    worker.shell.kill();
+    
+    for (const queuedJob of queued) {
+      dispatchJob(worker.scriptName, worker.pythonPath, queuedJob);
+    }
+  }, timeout);
+}
+
+/**
+ * Choose the worker for the next job: an idle one, a new one while the pool
+ * has room, or else the one with the fewest queued jobs
+ * @param {string} scriptName Name of the worker script (without path)
+ * @param {string} pythonPath Path to Python executable
+ * @returns {Object} Worker state
+ */
+function pickWorker(scriptName, pythonPath) {
+  const pool = pools[scriptName] || (pools[scriptName] = []);
+  
+  const idle = pool.find(worker => worker.pending.size === 0);
+  if (idle) {
+    return idle;
+  }
+  
+  if (pool.length < Math.max(1, config.python.workerPoolSize || 1)) {
+    const worker = startWorker(scriptName, pythonPath);
+    pool.push(worker);
+    return worker;
+  }
+  
+  return pool.reduce((least, worker) => (worker.pending.size < least.pending.size ? worker : least));
+}
+
+/**
+ * Queue a job on a worker, starting its timer if nothing else is running
+ * @param {string} scriptName Name of the worker script (without path)
+ * @param {string} pythonPath Path to Python executable
+ * @param {Object} job Job payload with its resolve/reject callbacks
+ */
+function dispatchJob(scriptName, pythonPath, job) {
+  const worker = pickWorker(scriptName, pythonPath);
+  const id = worker.nextId++;
+  worker.pending.set(id, job);
+  worker.shell.send(JSON.stringify({ ...job.payload, id }));
+  if (worker.pending.size === 1) {
+    armJobTimer(worker);
+  }
+}
+
+/**
+ * Send a job to a persistent Python worker, starting it if needed
+ * @param {string} scriptName Name of the worker script (without path)
+ * @param {Object} payload Job parameters passed to the worker
+ * @param {string} pythonPath Path to Python executable
+ * @returns {Promise<any>} Result reported by the worker for this job
+ */
+async function runWorkerJob(scriptName, payload = {}, pythonPath = 'python3') {
+  const scriptPath = pathResolver.resolvePythonScript(scriptName);
+  if (!checkScriptExists(scriptPath)) {
+    throw new Error(`Python script not found: ${scriptName} (looked in ${pathResolver.getPythonScriptDir()})`);
+  }
+  
+  return new Promise((resolve, reject) => {
+    dispatchJob(scriptName, pythonPath, { payload, resolve, reject });
+  });
+}
+
+/**
+ * Stop all running Python workers
+ */
+function stopWorkers() {
+  for (const [scriptName, pool] of Object.entries(pools)) {
+    delete pools[scriptName];
+    for (const worker of pool) {
+      worker.shell.end(() => {});
+    }
+  }
+}
+
+module.exports = {
+  runWorkerJob,
+  stopWorkers
+};
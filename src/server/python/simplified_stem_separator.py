@@ -2,13 +2,114 @@
 #!/usr/bin/env python3
 import os
 import sys
-import json
 import traceback
-import subprocess
-import numpy as np
-from pathlib import Path
+from pathlib import PurePath
+from process_utils import run_ffmpeg
 
-def separate_stems_lightweight(audio_path, output_dir, light_mode=False):
+# Filter chains for the simplified stems
+STEM_FILTERS = {
+    # Vocals: midrange frequencies (200Hz-5kHz)
+    "vocals": "bandpass=f=2000:width_type=h:width=4800,acompressor=threshold=-20dB:ratio=4:attack=20:release=100",
+    # Drums: higher frequencies with fast transients
+    "drums": "highpass=f=200,lowpass=f=8000,acompressor=threshold=-15dB:ratio=5:attack=5:release=50",
+    # Bass: low frequencies (below 250Hz)
+    "bass": "lowpass=f=250,acompressor=threshold=-10dB:ratio=6:attack=10:release=80",
+    # Other: remaining frequencies
+    "other": "bandreject=f=2000:width_type=h:width=4800,bandreject=f=100:width_type=h:width=300"
+}
+
+# Cheaper filter chains used when the main separation fails
+FALLBACK_STEM_FILTERS = {
+    # For vocals, use bandpass filter
+    "vocals": "bandpass=f=2000:width_type=h:width=3000,volume=0.8",
+    # For drums, use bandpass filter
+    "drums": "bandpass=f=1000:width_type=h:width=2000,volume=0.5",
+    # For bass, use lowpass filter
+    "bass": "lowpass=f=200,volume=0.6",
+    # For other, just reduce volume
+    "other": "volume=0.4"
+}
+
+def run_split_filters(audio_path, stem_filters, bitrate, stem_paths):
+    """
+    Render every stem from a single ffmpeg process
+    
+    The input is decoded once and fanned out with asplit, so each stem only
+    costs its filter chain and encoder instead of a full decode.
+    
+    Args:
+        audio_path: Path to the audio file
+        stem_filters: Filter chain per stem type
+        bitrate: Output audio bitrate
+        stem_paths: Output path per stem type
+    """
+    labels = [f"s{i}" for i in range(len(stem_filters))]
+    graph = [f"[0:a]asplit={len(stem_filters)}" + "".join(f"[{label}]" for label in labels)]
+    outputs = []
+    for label, (stem_type, audio_filter) in zip(labels, stem_filters.items()):
+        graph.append(f"[{label}]{audio_filter}[{stem_type}]")
+        outputs += ["-map", f"[{stem_type}]", "-b:a", bitrate, stem_paths[stem_type]]
+    
+    run_ffmpeg([
+        "-y", "-i", audio_path,
+        "-filter_complex", ";".join(graph),
+        *outputs
+    ])
+
+# Frequency-domain approximations of STEM_FILTERS (without the
+# compressors), as the (low, high) Hz bands each stem keeps
+STEM_BANDS = {
+    "vocals": [(200, 5000)],
+    "drums": [(200, 8000)],
+    "bass": [(0, 250)],
+    "other": [(0, 20), (5000, float("inf"))]
+}
+
+def separate_stems_in_memory(audio_path):
+    """
+    Separate audio into stem arrays without encoding anything to disk
+    
+    The input is decoded once and transformed with a single STFT; each stem
+    is a frequency mask over that spectrum followed by one inverse STFT.
+    
+    Args:
+        audio_path: Path to the audio file
+        
+    Returns:
+        tuple: (dict of float32 arrays per stem type, sample rate)
+    """
+    # Imported here so path-only callers don't pay for numpy, soundfile
+    # and scipy
+    import numpy as np
+    import soundfile as sf
+    from scipy import signal
+    
+    y, sr = sf.read(audio_path, dtype="float32", always_2d=True)
+    n_samples = len(y)
+    
+    # Channels first so the masks broadcast over (channel, bin, frame)
+    freqs, _, spectrum = signal.stft(y.T, fs=sr, nperseg=2048)
+    
+    stems = {}
+    for stem_type, bands in STEM_BANDS.items():
+        mask = np.zeros(len(freqs), dtype=bool)
+        for low, high in bands:
+            mask |= (freqs >= low) & (freqs < high)
+        
+        _, stem = signal.istft(spectrum * mask[:, None], fs=sr, nperseg=2048)
+        stem = stem[:, :n_samples].T.astype(np.float32, copy=False)
+        stems[stem_type] = stem[:, 0] if stem.shape[1] == 1 else stem
+    
+    return stems, sr
+
+def get_stem_paths(stems_dir, file_ext):
+    """Output path for every stem type in stems_dir"""
+    return {
+        stem_type: os.path.join(stems_dir, f"{stem_type}.{file_ext}")
+        for stem_type in ("vocals", "drums", "bass", "other")
+    }
+
+def separate_stems_lightweight(audio_path, output_dir, light_mode=False, return_arrays=False):
     """
     Separate audio file into stems using FFmpeg directly for faster processing
     with fewer dependencies
@@ -17,66 +118,41 @@ def separate_stems_lightweight(audio_path, output_dir, light_mode=False):
         audio_path: Path to the audio file
         output_dir: Directory to save separated stems
         light_mode: If True, uses faster but lower quality separation
+        return_arrays: If True, return the stems as arrays instead of
+                       encoding them to files in output_dir
         
     Returns:
-        dict: Dictionary containing paths to separated stems
+        dict: Dictionary containing paths to separated stems, or a
+              (stem arrays, sample rate) tuple when return_arrays is set
     """
+    if return_arrays:
+        return separate_stems_in_memory(audio_path)
+    
+    # Base filename without extension. Computed before the try block so the
+    # fallback below can always use it, and via PurePath.stem so names like
+    # "my.song.mp3" keep their full stem
+    base_filename = PurePath(audio_path).stem
+    stems_dir = os.path.join(output_dir, base_filename)
+    
     try:
         print(f"Starting lightweight stem separation for {audio_path}", file=sys.stderr)
         # Create output directory if it doesn't exist
-        os.makedirs(output_dir, exist_ok=True)
-        
-        # Base filename without extension
-        base_filename = os.path.basename(audio_path).split('.')[0]
-        stems_dir = os.path.join(output_dir, base_filename)
         os.makedirs(stems_dir, exist_ok=True)
         
-        # File extension based on mode
-        file_ext = "mp3" if light_mode else "wav"
+        # Always encode MP3; only the bitrate depends on the mode. Standard
+        # mode used to write uncompressed WAV, where -b:a had no effect
+        file_ext = "mp3"
         bitrate = "96k" if light_mode else "256k"
         
         # Separate using frequency-based filtering with FFmpeg
         # This is a simplified approach that doesn't require machine learning libraries
         
         # Create stems paths
-        stem_paths = {
-            "vocals": os.path.join(stems_dir, f"vocals.{file_ext}"),
-            "drums": os.path.join(stems_dir, f"drums.{file_ext}"),
-            "bass": os.path.join(stems_dir, f"bass.{file_ext}"),
-            "other": os.path.join(stems_dir, f"other.{file_ext}")
-        }
+        stem_paths = get_stem_paths(stems_dir, file_ext)
         
-        # Create simplified stems with FFmpeg frequency filtering
-        # Vocals: midrange frequencies (200Hz-5kHz)
-        subprocess.run([
-            "ffmpeg", "-i", audio_path,
-            "-af", "bandpass=f=2000:width_type=h:width=4800,acompressor=threshold=-20dB:ratio=4:attack=20:release=100",
-            "-b:a", bitrate, "-y", stem_paths["vocals"]
-        ], check=True, stderr=subprocess.PIPE)
-        print("PROGRESS:25", file=sys.stderr)
-        
-        # Drums: higher frequencies with fast transients
-        subprocess.run([
-            "ffmpeg", "-i", audio_path,
-            "-af", "highpass=f=200,lowpass=f=8000,acompressor=threshold=-15dB:ratio=5:attack=5:release=50",
-            "-b:a", bitrate, "-y", stem_paths["drums"]
-        ], check=True, stderr=subprocess.PIPE)
-        print("PROGRESS:50", file=sys.stderr)
-        
-        # Bass: low frequencies (below 250Hz)
-        subprocess.run([
-            "ffmpeg", "-i", audio_path,
-            "-af", "lowpass=f=250,acompressor=threshold=-10dB:ratio=6:attack=10:release=80",
-            "-b:a", bitrate, "-y", stem_paths["bass"]
-        ], check=True, stderr=subprocess.PIPE)
-        print("PROGRESS:75", file=sys.stderr)
-        
-        # Other: remaining frequencies
-        subprocess.run([
-            "ffmpeg", "-i", audio_path,
-            "-af", "bandreject=f=2000:width_type=h:width=4800,bandreject=f=100:width_type=h:width=300",
-            "-b:a", bitrate, "-y", stem_paths["other"]
-        ], check=True, stderr=subprocess.PIPE)
+        # Create simplified stems with FFmpeg frequency filtering, all from
+        # one decode of the input
+        run_split_filters(audio_path, STEM_FILTERS, bitrate, stem_paths)
         print("PROGRESS:100", file=sys.stderr)
         
         return stem_paths
@@ -88,42 +164,11 @@ def separate_stems_lightweight(audio_path, output_dir, light_mode=False):
         
         # Create fallback stems (just copy the original audio to all stems)
         try:
-            stem_paths = {}
-            for stem_type in ["vocals", "drums", "bass", "other"]:
-                output_path = os.path.join(output_dir, base_filename, f"{stem_type}.mp3")
-                os.makedirs(os.path.dirname(output_path), exist_ok=True)
-                
-                # Create a simplified version with volume adjustments
-                if stem_type == "vocals":
-                    # For vocals, use bandpass filter
-                    subprocess.run([
-                        "ffmpeg", "-i", audio_path,
-                        "-af", "bandpass=f=2000:width_type=h:width=3000,volume=0.8",
-                        "-b:a", "128k", "-y", output_path
-                    ], check=True, stderr=subprocess.PIPE)
-                elif stem_type == "bass":
-                    # For bass, use lowpass filter
-                    subprocess.run([
-                        "ffmpeg", "-i", audio_path,
-                        "-af", "lowpass=f=200,volume=0.6",
-                        "-b:a", "128k", "-y", output_path
-                    ], check=True, stderr=subprocess.PIPE)
-                elif stem_type == "drums":
-                    # For drums, use bandpass filter
-                    subprocess.run([
-                        "ffmpeg", "-i", audio_path,
-                        "-af", "bandpass=f=1000:width_type=h:width=2000,volume=0.5",
-                        "-b:a", "128k", "-y", output_path
-                    ], check=True, stderr=subprocess.PIPE)
-                else:
-                    # For other, just reduce volume
-                    subprocess.run([
-                        "ffmpeg", "-i", audio_path,
-                        "-af", "volume=0.4",
-                        "-b:a", "128k", "-y", output_path
-                    ], check=True, stderr=subprocess.PIPE)
-                
-                stem_paths[stem_type] = output_path
+            os.makedirs(stems_dir, exist_ok=True)
+            
+            # Create simplified versions with volume adjustments
+            stem_paths = get_stem_paths(stems_dir, "mp3")
+            run_split_filters(audio_path, FALLBACK_STEM_FILTERS, "128k", stem_paths)
             
             return stem_paths
         except Exception as fallback_error:
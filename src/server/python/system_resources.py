@@ -3,21 +3,57 @@
 import os
 import sys
 import platform
-import psutil
+import functools
 
+# Resolved once; platform.system() can be slow on Windows
+SYSTEM_PLATFORM = platform.system()
+
+def read_meminfo():
+    """Total and available memory in bytes from /proc/meminfo (Linux)"""
+    values = {}
+    with open("/proc/meminfo") as f:
+        for line in f:
+            key, _, rest = line.partition(":")
+            if key in ("MemTotal", "MemAvailable"):
+                values[key] = int(rest.split()[0]) * 1024
+                if len(values) == 2:
+                    break
+    return values["MemTotal"], values["MemAvailable"]
+
+def get_memory_info():
+    """Total and available memory in bytes, without psutil on Linux"""
+    if SYSTEM_PLATFORM == "Linux":
+        return read_meminfo()
+    # psutil is only needed where there is no /proc to read
+    import psutil
+    memory = psutil.virtual_memory()
+    return memory.total, memory.available
+
+def get_cpu_count():
+    """Number of CPUs this process may run on"""
+    if hasattr(os, "sched_getaffinity"):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+@functools.lru_cache(maxsize=1)
 def get_system_resources():
-    """Get system resource information to determine processing capacity"""
+    """
+    Get system resource information to determine processing capacity
+    
+    Probed once per process, so the diagnostics below are printed only on
+    the first call.
+    """
     try:
         # Get memory information
-        memory = psutil.virtual_memory()
-        total_memory_gb = memory.total / (1024**3)
-        available_memory_gb = memory.available / (1024**3)
+        total_memory, available_memory = get_memory_info()
+        total_memory_gb = total_memory / (1024**3)
+        available_memory_gb = available_memory / (1024**3)
         
         # Get CPU information
-        cpu_count = psutil.cpu_count(logical=False) or psutil.cpu_count(logical=True)
+        cpu_count = get_cpu_count()
         
         # Platform information
-        system_platform = platform.system()
+        system_platform = SYSTEM_PLATFORM
         architecture = platform.machine()
         
         # Determine if we're on a resource-constrained system
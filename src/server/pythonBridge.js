@@ -7,6 +7,7 @@
 
 const { checkPythonEnvironment, getPythonPath, hasLibrosa } = require('./python/pythonEnvironment');
 const { runScript, runScriptWithProgress } = require('./python/pythonExecutor');
+const { runWorkerJob, stopWorkers } = require('./python/pythonWorker');
 const { pathResolver } = require('./utils/systemUtils');
 const fs = require('fs');
 const path = require('path');
@@ -63,6 +64,22 @@ async function runPythonScriptWithProgress(scriptName, args = [], onProgress = n
   return runScriptWithProgress(scriptName, args, onProgress, options, getPythonPath());
 }
 
+/**
+ * Run a job on a persistent Python worker process
+ * @param {string} scriptName Name of the worker script (without path)
+ * @param {Object} payload Job parameters passed to the worker
+ * @returns {Promise<any>} Result reported by the worker
+ */
+async function runPythonWorker(scriptName, payload = {}) {
+  // Ensure environment is checked
+  if (!environmentChecked) {
+    await checkPythonEnvironment();
+  }
+  
+  console.log(`Running Python worker job: ${scriptName} with payload:`, payload);
+  return runWorkerJob(scriptName, payload, getPythonPath());
+}
+
 /**
  * Check if Python environment has been initialized
  * @returns {Promise<boolean>} True if environment has been checked
@@ -98,6 +115,8 @@ function getPythonEnvironmentStatus() {
 module.exports = {
   runPythonScript,
   runPythonScriptWithProgress,
+  runPythonWorker,
+  stopPythonWorkers: stopWorkers,
   checkPythonEnvironment,
   isPythonEnvironmentChecked,
   getPythonEnvironmentStatus,
@@ -2,6 +2,7 @@
 const path = require('path');
 const fs = require('fs');
 const os = require('os');
+const crypto = require('crypto');
 const config = require('../config');
 
 /**
@@ -136,6 +137,13 @@ const pathResolver = {
     return config.fileStorage.tempDir;
   },
   
+  /**
+   * Get the RAM-backed tmpfs that mix intermediates may be written to
+   */
+  getShmDir: () => {
+    return '/dev/shm';
+  },
+  
   /**
    * Get path for a processed audio file
    * @param {string} filename - Base filename
@@ -172,12 +180,33 @@ const fileManager = {
     });
   },
   
+  /**
+   * Hash a file's contents for use as a cache key
+   * @param {string} filePath - File to hash
+   * @returns {Promise<string>} Hex digest that changes with the file's contents, not its name
+   */
+  hashFile: (filePath) => {
+    return new Promise((resolve, reject) => {
+      const hash = crypto.createHash('sha1');
+      fs.createReadStream(filePath)
+        .on('error', reject)
+        .on('data', chunk => hash.update(chunk))
+        .on('end', () => resolve(hash.digest('hex')));
+    });
+  },
+  
   /**
    * Clean up temporary files
-   * @param {string} directory - Directory to clean
+   * @param {string} directory - Directory to clean (defaults to the temp dir and the tmpfs mix dir)
    * @param {number} maxAgeHours - Maximum age in hours
    */
   cleanupTempFiles: (directory = null, maxAgeHours = 24) => {
+    if (!directory) {
+      // Mix intermediates may also live in tmpfs, where leftovers from a
+      // crashed mix would otherwise hold RAM until reboot
+      fileManager.cleanupTempFiles(path.join(pathResolver.getShmDir(), 'mixify-tmp'), maxAgeHours);
+    }
+    
     try {
       const dir = directory || pathResolver.getTempDir();
       if (!fs.existsSync(dir)) {